@@ -1,7 +1,10 @@
 from fastapi import APIRouter
-from .endpoints import auth, sweets, user
+from .endpoints import auth, sweets, user, sales, categories, reservations
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(sweets.router, prefix="/sweets", tags=["sweets"])
-api_router.include_router(user.router, prefix="/users", tags=["users"])
\ No newline at end of file
+api_router.include_router(user.router, prefix="/users", tags=["users"])
+api_router.include_router(sales.router, prefix="/sales", tags=["sales"])
+api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
+api_router.include_router(reservations.router, prefix="/reservations", tags=["reservations"])
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from typing import Any
@@ -8,6 +8,9 @@ from app.crud import user as crud_user
 from app.schemas.user import User, UserCreate, UserLogin, Token
 from app.core.security import create_access_token, get_password_hash
 from app.core.config import settings
+from app.core.rate_limit import login_throttle
+from app.core.deps import get_current_admin_user
+from app.models.user import User as UserModel
 
 router = APIRouter()
 
@@ -15,7 +18,7 @@ router = APIRouter()
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
 def register(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     user_in: UserCreate,
 ) -> Any:
     """
@@ -33,12 +36,17 @@ def register(
 
 @router.post("/login", response_model=Token)
 def login(
-    db: Session = Depends(get_db), 
+    request: Request,
+    db: Session = Depends(get_db, scope="function"), 
     form_data: UserLogin = None
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
+    client_ip = request.client.host if request.client else "unknown"
+    # Take an attempt before spending a DB lookup or bcrypt verify; refunded on success
+    login_throttle.acquire(client_ip, form_data.email)
+
     user = crud_user.user.authenticate(
         db, email=form_data.email, password=form_data.password
     )
@@ -47,7 +55,8 @@ def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
-    elif not crud_user.user.is_active(user):
+    login_throttle.record_success(client_ip, form_data.email)
+    if not crud_user.user.is_active(user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
@@ -58,4 +67,14 @@ def login(
             data={"sub": str(user.id)}, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/throttle-stats")
+def read_throttle_stats(
+    current_user: UserModel = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Allowed and rejected login attempt counters. Admin only.
+    """
+    return dict(login_throttle.counters)
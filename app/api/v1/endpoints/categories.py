@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Any, List
+
+from app.db.session import get_db
+from app.crud import category as crud_category
+from app.schemas.category import CategoryWithCount
+from app.models.user import User
+from app.core.deps import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[CategoryWithCount])
+def read_categories(
+    db: Session = Depends(get_db, scope="function"),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Retrieve all categories with the number of sweets in each.
+    """
+    rows = crud_category.category.get_multi_with_counts(db)
+    return [
+        CategoryWithCount(id=id, name=name, sweet_count=count)
+        for id, name, count in rows
+    ]
@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Any, List
+
+from app.db.session import get_db
+from app.crud import reservation as crud_reservation
+from app.schemas.reservation import Reservation, ReservationCreate
+from app.schemas.sweet import InventoryResponse
+from app.models.user import User
+from app.core.config import settings
+from app.core.deps import get_current_user
+
+router = APIRouter()
+
+
+@router.post("/", response_model=Reservation, status_code=status.HTTP_201_CREATED)
+def create_reservation(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    reservation_in: ReservationCreate,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Hold stock of a sweet for a limited time.
+    """
+    ttl_seconds = min(
+        reservation_in.ttl_seconds or settings.reservation_ttl_seconds,
+        settings.reservation_max_ttl_seconds,
+    )
+    try:
+        return crud_reservation.reservation.create(
+            db,
+            sweet_id=reservation_in.sweet_id,
+            user_id=current_user.id,
+            quantity=reservation_in.quantity,
+            ttl_seconds=ttl_seconds,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/", response_model=List[Reservation])
+def read_reservations(
+    db: Session = Depends(get_db, scope="function"),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    List the current user's active reservations.
+    """
+    return crud_reservation.reservation.get_multi_by_user(db, user_id=current_user.id)
+
+
+@router.post("/{id}/confirm", response_model=InventoryResponse)
+def confirm_reservation(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    id: int,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Complete the purchase of a reserved sweet.
+    """
+    confirmed = crud_reservation.reservation.confirm(db, id=id, user_id=current_user.id)
+    if not confirmed:
+        raise HTTPException(status_code=404, detail="Reservation not found or expired")
+    sweet_id, quantity, stock_left = confirmed
+    return InventoryResponse(
+        message=f"Successfully purchased {quantity} units",
+        sweet_id=sweet_id,
+        new_quantity=stock_left,
+    )
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_reservation(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    id: int,
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """
+    Cancel a reservation and return its stock.
+    """
+    if not crud_reservation.reservation.release(db, id=id, user_id=current_user.id):
+        raise HTTPException(status_code=404, detail="Reservation not found or expired")
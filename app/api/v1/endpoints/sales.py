@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, List, Optional
+
+from app.db.session import get_db
+from app.crud import sales as crud_sales
+from app.schemas.sales import TopSeller, SalesPoint
+from app.models.user import User
+from app.core.deps import get_current_admin_user
+
+router = APIRouter()
+
+GRANULARITY_PATTERN = "^(hour|day)$"
+
+
+@router.get("/top", response_model=List[TopSeller])
+def read_top_sellers(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN, description="Rollup to read: hour or day"),
+    start: Optional[datetime] = Query(None, description="Include buckets from this time"),
+    end: Optional[datetime] = Query(None, description="Include buckets before this time"),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Best-selling sweets by units sold. Admin only.
+    """
+    rows = crud_sales.sales.top_sellers(db, granularity=granularity, start=start, end=end, limit=limit)
+    return [
+        TopSeller(sweet_id=sweet_id, name=name, units=units, revenue=revenue)
+        for sweet_id, name, units, revenue in rows
+    ]
+
+
+@router.get("/timeseries", response_model=List[SalesPoint])
+def read_sales_timeseries(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    granularity: str = Query("hour", pattern=GRANULARITY_PATTERN, description="Bucket size: hour or day"),
+    sweet_id: Optional[int] = Query(None, description="Limit to one sweet"),
+    start: Optional[datetime] = Query(None, description="Include buckets from this time"),
+    end: Optional[datetime] = Query(None, description="Include buckets before this time"),
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Units sold and revenue per hour or day. Admin only.
+    """
+    rows = crud_sales.sales.timeseries(db, granularity=granularity, sweet_id=sweet_id, start=start, end=end)
+    return [
+        SalesPoint(bucket_start=bucket, units=units, revenue=revenue)
+        for bucket, units, revenue in rows
+    ]
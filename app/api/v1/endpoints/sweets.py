@@ -1,20 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Any, List, Optional
 
 from app.db.session import get_db
 from app.crud import sweet as crud_sweet
-from app.schemas.sweet import Sweet, SweetCreate, SweetUpdate, SweetSearch, InventoryResponse, PurchaseRequest, RestockRequest
+from app.schemas.sweet import MAX_BATCH_IDS, Sweet, SweetCreate, SweetUpdate, SweetSearch, SweetBatchRequest, SweetBatchResponse, BulkInventoryRequest, BulkInventoryResponse, BulkInventoryResult, InventoryResponse, PurchaseRequest, RestockRequest
 from app.models.user import User
 from app.core.deps import get_current_user, get_current_admin_user
 
 router = APIRouter()
 
 
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in Sweet.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id"] + requested))
+
+
+def _sparse(obj, fields: List[str]) -> dict:
+    return {f: getattr(obj, f) for f in fields}
+
+
+def _etag(sweet) -> str:
+    return f'"{sweet.version}"'
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Return the version named by an If-Match header, or None for ``*``."""
+    if if_match is None:
+        raise HTTPException(
+            status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+            detail="If-Match header with the sweet's ETag is required",
+        )
+    tag = if_match.strip()
+    if tag == "*":
+        return None
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Sweet has been modified")
+
+
+FIELDS_DESCRIPTION = "Comma-separated subset of fields to return, e.g. id,name,price,quantity"
+
+
 @router.post("/", response_model=Sweet, status_code=status.HTTP_201_CREATED)
 def create_sweet(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     sweet_in: SweetCreate,
     current_user: User = Depends(get_current_admin_user),
 ) -> Any:
@@ -27,81 +80,157 @@ def create_sweet(
 
 @router.get("/", response_model=List[Sweet])
 def read_sweets(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Retrieve sweets.
     """
-    sweets = crud_sweet.sweet.get_multi(db, skip=skip, limit=limit)
+    field_list = _parse_fields(fields)
+    sweets = crud_sweet.sweet.get_multi(db, skip=skip, limit=limit, fields=field_list)
+    if field_list:
+        return JSONResponse(jsonable_encoder([_sparse(s, field_list) for s in sweets]))
     return sweets
 
 
 @router.get("/search", response_model=List[Sweet])
 def search_sweets(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     name: Optional[str] = Query(None, description="Search by sweet name"),
     category: Optional[str] = Query(None, description="Search by category"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Search sweets by name, category, or price range.
     """
+    field_list = _parse_fields(fields)
     search_params = SweetSearch(
         name=name,
         category=category,
         min_price=min_price,
         max_price=max_price
     )
-    sweets = crud_sweet.sweet.search(db, search_params=search_params, skip=skip, limit=limit)
+    sweets = crud_sweet.sweet.search(
+        db, search_params=search_params, skip=skip, limit=limit, fields=field_list
+    )
+    if field_list:
+        return JSONResponse(jsonable_encoder([_sparse(s, field_list) for s in sweets]))
     return sweets
 
 
+@router.get("/batch", response_model=SweetBatchResponse)
+def read_sweets_batch(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    ids: str = Query(..., description="Comma-separated sweet IDs, e.g. 1,2,3"),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get several sweets by ID in one request. Results keep request order.
+    """
+    sweets, missing = crud_sweet.sweet.get_many(db, ids=_parse_ids(ids))
+    return SweetBatchResponse(items=sweets, missing=missing)
+
+
+@router.post("/batch", response_model=SweetBatchResponse)
+def read_sweets_batch_post(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    batch_in: SweetBatchRequest,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get several sweets by ID, for lists too long for a query string.
+    """
+    sweets, missing = crud_sweet.sweet.get_many(db, ids=batch_in.ids)
+    return SweetBatchResponse(items=sweets, missing=missing)
+
+
+@router.post("/bulk-update", response_model=BulkInventoryResponse)
+def bulk_update_sweets(
+    *,
+    db: Session = Depends(get_db, scope="function"),
+    bulk_in: BulkInventoryRequest,
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Restock and reprice many sweets in a single transaction. Admin only.
+    """
+    try:
+        rows, missing = crud_sweet.sweet.bulk_update(db, items=bulk_in.items, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return BulkInventoryResponse(
+        items=[BulkInventoryResult(sweet_id=id, quantity=quantity, price=price) for id, quantity, price in rows],
+        missing=missing,
+    )
+
+
 @router.get("/{id}", response_model=Sweet)
 def read_sweet(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Get sweet by ID.
+    Get sweet by ID. The ETag header carries the sweet's version.
     """
-    sweet = crud_sweet.sweet.get(db, id=id)
+    field_list = _parse_fields(fields)
+    sweet = crud_sweet.sweet.get(db, id=id, fields=field_list)
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
+    if field_list:
+        return JSONResponse(jsonable_encoder(_sparse(sweet, field_list)), headers={"ETag": _etag(sweet)})
+    response.headers["ETag"] = _etag(sweet)
     return sweet
 
 
 @router.put("/{id}", response_model=Sweet)
 def update_sweet(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     id: int,
     sweet_in: SweetUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_admin_user),
 ) -> Any:
     """
     Update sweet. Admin only.
+
+    Requires an If-Match header with the ETag from the last read; a stale
+    ETag gets 412 Precondition Failed.
     """
+    expected_version = _parse_if_match(if_match)
     sweet = crud_sweet.sweet.get(db, id=id)
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
-    sweet = crud_sweet.sweet.update(db, db_obj=sweet, obj_in=sweet_in)
+    try:
+        sweet = crud_sweet.sweet.update(
+            db, db_obj=sweet, obj_in=sweet_in, user_id=current_user.id, expected_version=expected_version
+        )
+    except crud_sweet.VersionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    response.headers["ETag"] = _etag(sweet)
     return sweet
 
 
 @router.delete("/{id}", response_model=Sweet)
 def delete_sweet(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     id: int,
     current_user: User = Depends(get_current_admin_user),
 ) -> Any:
@@ -111,14 +240,14 @@ def delete_sweet(
     sweet = crud_sweet.sweet.get(db, id=id)
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
-    sweet = crud_sweet.sweet.remove(db, id=id)
+    sweet = crud_sweet.sweet.remove(db, id=id, user_id=current_user.id)
     return sweet
 
 
 @router.post("/{id}/purchase", response_model=InventoryResponse)
 def purchase_sweet(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     id: int,
     purchase_data: PurchaseRequest,
     current_user: User = Depends(get_current_user),
@@ -127,7 +256,9 @@ def purchase_sweet(
     Purchase a sweet, decreasing its quantity.
     """
     try:
-        sweet = crud_sweet.sweet.purchase(db, sweet_id=id, quantity=purchase_data.quantity)
+        sweet = crud_sweet.sweet.purchase(
+            db, sweet_id=id, quantity=purchase_data.quantity, user_id=current_user.id
+        )
         if not sweet:
             raise HTTPException(status_code=404, detail="Sweet not found")
         
@@ -138,12 +269,14 @@ def purchase_sweet(
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except crud_sweet.VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.post("/{id}/restock", response_model=InventoryResponse)
 def restock_sweet(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db, scope="function"),
     id: int,
     restock_data: RestockRequest,
     current_user: User = Depends(get_current_admin_user),
@@ -151,7 +284,12 @@ def restock_sweet(
     """
     Restock a sweet, increasing its quantity. Admin only.
     """
-    sweet = crud_sweet.sweet.restock(db, sweet_id=id, quantity=restock_data.quantity)
+    try:
+        sweet = crud_sweet.sweet.restock(
+            db, sweet_id=id, quantity=restock_data.quantity, user_id=current_user.id
+        )
+    except crud_sweet.VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
     
@@ -7,10 +7,24 @@ class Settings(BaseSettings):
     # Database
     database_url: Optional[str] = None
 
+    # SQLite mode (used automatically for sqlite:/// file URLs)
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "NORMAL"  # NORMAL is durable across app crashes in WAL mode
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_reader_pool_size: int = 8
+    sqlite_write_batch_size: int = 64  # max writes per group commit
+
     # Security
     secret_key: str = "your-super-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_size: int = 1024  # verified JWTs kept in memory; 0 disables
+
+    # Login throttling (failed attempts per bucket, one attempt regained per refill period)
+    login_rate_limit_backend: str = "memory"  # "memory" or "shared"
+    login_ip_max_attempts: int = 20
+    login_email_max_attempts: int = 5
+    login_refill_seconds: float = 60.0
 
     # Application
     app_name: str = "Sweet Shop API"
@@ -19,6 +33,20 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # Category listing cache
+    category_cache_ttl: float = 60.0
+
+    # Inventory ledger (write-behind)
+    ledger_flush_interval: float = 1.0
+    ledger_batch_size: int = 500
+    ledger_max_pending: int = 10000
+
+    # Cart reservations
+    reservation_ttl_seconds: int = 900
+    reservation_max_ttl_seconds: int = 3600
+    reservation_sweep_interval: float = 5.0
+    reservation_sweep_batch_size: int = 1000
+
     # Admin
     admin_email: str = "admin@sweetshop.com"
     admin_password: str = "admin123"
@@ -12,7 +12,7 @@ security = HTTPBearer()
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db, scope="function")
 ) -> User:
     """Get current authenticated user."""
     token = credentials.credentials
@@ -0,0 +1,205 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from .config import settings
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets. Buckets are ``(tokens, updated_at)`` pairs.
+
+    ``clock`` is the time source bucket timestamps are taken from. It defaults to
+    wall-clock time because buckets in a shared store are read by other
+    processes and hosts, whose monotonic clocks have unrelated origins.
+    """
+
+    clock: Callable[[], float] = staticmethod(time.time)
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, bucket: Tuple[float, float]) -> None:
+        ...
+
+    @abstractmethod
+    def lock(self, key: str):
+        ...
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Process-local buckets for a single API node."""
+
+    # Never leaves this process, so it can ignore wall-clock adjustments
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        return self._buckets.get(key)
+
+    def set(self, key: str, bucket: Tuple[float, float]) -> None:
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            # Drop the oldest entry; a forgotten bucket only means a full one
+            self._buckets.pop(next(iter(self._buckets)))
+        self._buckets[key] = bucket
+
+    def lock(self, key: str):
+        return self._lock
+
+
+class LocalStore:
+    """In-process stand-in for a shared key-value store client."""
+
+    def __init__(self):
+        self._data: Dict[str, str] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._data.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._data[key] = value
+
+
+class SharedStoreRateLimitBackend(RateLimitBackend):
+    """Buckets kept in a shared key-value store so every node sees the same counts.
+
+    ``store`` needs ``get(key)`` and ``set(key, value)`` with string values, which
+    a Redis or memcached client provides. The default ``LocalStore`` stands in
+    for the shared store. Updates are read-modify-write; pair this with
+    a store-side lock or script when nodes race on the same key.
+    """
+
+    def __init__(self, store=None, prefix: str = "ratelimit:"):
+        self.store = store if store is not None else LocalStore()
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        raw = self.store.get(self.prefix + key)
+        if raw is None:
+            return None
+        tokens, updated_at = json.loads(raw)
+        return tokens, updated_at
+
+    def set(self, key: str, bucket: Tuple[float, float]) -> None:
+        self.store.set(self.prefix + key, json.dumps(list(bucket)))
+
+    def lock(self, key: str):
+        return self._lock
+
+
+class TokenBucketLimiter:
+    """Token bucket per key: ``capacity`` tokens, one refilled every ``refill_seconds``.
+
+    ``acquire`` checks and spends a token in one step under the backend lock,
+    so concurrent callers cannot all pass on the same last token. ``refund``
+    gives it back, which lets callers charge for failures only.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        refill_seconds: float,
+        backend: Optional[RateLimitBackend] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.backend = backend or MemoryRateLimitBackend()
+        self.clock = clock or self.backend.clock
+
+    def _tokens(self, key: str, now: float) -> float:
+        bucket = self.backend.get(key)
+        if bucket is None:
+            return float(self.capacity)
+        tokens, updated_at = bucket
+        return min(float(self.capacity), tokens + (now - updated_at) / self.refill_seconds)
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until the next token is available."""
+        missing = 1 - self._tokens(key, self.clock())
+        return max(0, int(missing * self.refill_seconds + 0.999))
+
+    def acquire(self, key: str) -> bool:
+        """Spend a token if one is available. Returns False, spending nothing, if not."""
+        with self.backend.lock(key):
+            now = self.clock()
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                return False
+            self.backend.set(key, (tokens - 1, now))
+            return True
+
+    def refund(self, key: str) -> None:
+        """Give back a token taken by ``acquire``."""
+        with self.backend.lock(key):
+            now = self.clock()
+            self.backend.set(key, (min(float(self.capacity), self._tokens(key, now) + 1), now))
+
+
+class LoginThrottle:
+    """Failed-login limiter keyed by client IP and by email.
+
+    Every attempt takes a token from both buckets before the password is
+    checked, and a successful login hands them back. A burst of concurrent
+    guesses is therefore capped by the bucket size, not by how many requests
+    reach bcrypt before the first failure is recorded.
+    """
+
+    def __init__(self, ip_limiter: TokenBucketLimiter, email_limiter: TokenBucketLimiter):
+        self.ip_limiter = ip_limiter
+        self.email_limiter = email_limiter
+        self.counters = {"allowed": 0, "rejected": 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def _reject(self, limiter: TokenBucketLimiter, key: str) -> None:
+        self._count("rejected")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(limiter.retry_after(key))},
+        )
+
+    def acquire(self, ip: str, email: str) -> None:
+        """Take an attempt from the IP and email buckets, or raise 429 if either is empty."""
+        ip_key, email_key = f"ip:{ip}", f"email:{email.lower()}"
+        if not self.ip_limiter.acquire(ip_key):
+            self._reject(self.ip_limiter, ip_key)
+        if not self.email_limiter.acquire(email_key):
+            self.ip_limiter.refund(ip_key)
+            self._reject(self.email_limiter, email_key)
+        self._count("allowed")
+
+    def record_success(self, ip: str, email: str) -> None:
+        """Refund the attempt taken by ``acquire``; only failures are charged."""
+        self.ip_limiter.refund(f"ip:{ip}")
+        self.email_limiter.refund(f"email:{email.lower()}")
+
+
+def _build_backend() -> RateLimitBackend:
+    if settings.login_rate_limit_backend == "shared":
+        return SharedStoreRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+_backend = _build_backend()
+login_throttle = LoginThrottle(
+    ip_limiter=TokenBucketLimiter(
+        settings.login_ip_max_attempts, settings.login_refill_seconds, backend=_backend
+    ),
+    email_limiter=TokenBucketLimiter(
+        settings.login_email_max_attempts, settings.login_refill_seconds, backend=_backend
+    ),
+)
@@ -1,10 +1,14 @@
 from passlib.context import CryptContext
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from .config import settings
+import hashlib
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -48,14 +52,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> dict:
-    """Verify and decode JWT token."""
+class VerifiedTokenCache:
+    """Bounded LRU of decoded JWT payloads, keyed by the token's SHA-256 digest.
+
+    Only tokens that passed full verification are stored, and an entry is
+    dropped as soon as its ``exp`` has passed, using the same rule as
+    ``jwt.decode`` (expired once the current whole second is past ``exp``).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            if payload["exp"] < int(time.time()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, token: str, payload: dict) -> None:
+        # Tokens without a numeric expiry could be cached forever; skip them
+        if self.maxsize <= 0 or not isinstance(payload.get("exp"), (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(maxsize=settings.token_cache_size)
+
+
+def decode_token(token: str) -> dict:
+    """Verify and decode a JWT without consulting the cache."""
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+
+def verify_token(token: str) -> dict:
+    """Verify and decode JWT token."""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        token_cache.set(token, payload)
+    # Copy so callers cannot mutate the cached payload
+    return dict(payload)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
+from ..models.category import Category
+from ..models.sweet import Sweet
+from ..core.config import settings
+
+
+class CategoryListCache:
+    """Caches the category listing for ``ttl`` seconds.
+
+    Sweet writes that can change a count call ``invalidate``; the TTL bounds
+    staleness for writes made by other processes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Optional[List[Tuple[int, str, int]]] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[List[Tuple[int, str, int]]]:
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                return self._value
+            return None
+
+    def set(self, value: List[Tuple[int, str, int]]) -> None:
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+
+
+class CRUDCategory:
+    def __init__(self):
+        self.cache = CategoryListCache(ttl=settings.category_cache_ttl)
+
+    def get_by_name(self, db: Session, name: str) -> Optional[Category]:
+        """Case-insensitive lookup, served by the unique index on ``lower(name)``."""
+        return db.query(Category).filter(func.lower(Category.name) == name.strip().lower()).first()
+
+    def get_or_create(self, db: Session, name: str) -> Category:
+        """Return the category with this name (in any case), creating it if needed.
+
+        Does not commit; the new row is flushed inside a savepoint so a
+        concurrent insert of the same name falls back to a lookup.
+        """
+        name = name.strip()
+        category = self.get_by_name(db, name)
+        if category:
+            return category
+        try:
+            with db.begin_nested():
+                category = Category(name=name)
+                db.add(category)
+        except IntegrityError:
+            category = self.get_by_name(db, name)
+        return category
+
+    def get_multi_with_counts(self, db: Session) -> List[Tuple[int, str, int]]:
+        """All categories with their sweet counts, served from cache when fresh."""
+        cached = self.cache.get()
+        if cached is not None:
+            return cached
+        rows = (
+            db.query(Category.id, Category.name, func.count(Sweet.id))
+            .outerjoin(Sweet, Sweet.category_id == Category.id)
+            .group_by(Category.id, Category.name)
+            .order_by(Category.name)
+            .all()
+        )
+        value = [(id, name, count) for id, name, count in rows]
+        self.cache.set(value)
+        return value
+
+
+category = CRUDCategory()
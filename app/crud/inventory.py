@@ -0,0 +1,50 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from typing import Dict, List, Optional, Set
+from ..models.inventory import InventoryMovement
+from ..db.writer import serialized_write
+
+# Movements that establish a sweet's absolute stock level in the ledger
+BASELINE_REASONS = ("create", "opening")
+
+
+class CRUDInventory:
+    @serialized_write
+    def create_many(self, db: Session, movements: List[dict]) -> None:
+        """Insert a batch of movements in a single executemany."""
+        if not movements:
+            return
+        db.execute(insert(InventoryMovement), movements)
+        db.commit()
+
+    def get_for_sweet(
+        self, db: Session, sweet_id: int, skip: int = 0, limit: int = 100
+    ) -> List[InventoryMovement]:
+        return (
+            db.query(InventoryMovement)
+            .filter(InventoryMovement.sweet_id == sweet_id)
+            .order_by(InventoryMovement.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def replay(self, db: Session, sweet_id: Optional[int] = None) -> Dict[int, int]:
+        """Recompute stock levels by summing every movement per sweet."""
+        query = db.query(InventoryMovement.sweet_id, func.sum(InventoryMovement.delta))
+        if sweet_id is not None:
+            query = query.filter(InventoryMovement.sweet_id == sweet_id)
+        return {sid: int(total) for sid, total in query.group_by(InventoryMovement.sweet_id).all()}
+
+    def baselined_sweet_ids(self, db: Session) -> Set[int]:
+        """Sweets whose ledger starts from a known quantity ("create" or "opening")."""
+        rows = (
+            db.query(InventoryMovement.sweet_id)
+            .filter(InventoryMovement.reason.in_(BASELINE_REASONS))
+            .distinct()
+            .all()
+        )
+        return {sid for (sid,) in rows}
+
+
+inventory = CRUDInventory()
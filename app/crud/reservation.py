@@ -0,0 +1,125 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from ..models.reservation import Reservation
+from ..models.sweet import Sweet
+from ..db.ledger import inventory_ledger
+from ..db.writer import after_commit, serialized_write
+from .sales import sales as crud_sales
+from .sweet import sweet as crud_sweet
+
+
+class CRUDReservation:
+    @serialized_write
+    def create(
+        self, db: Session, sweet_id: int, user_id: int, quantity: int, ttl_seconds: int
+    ) -> Reservation:
+        """Hold stock for ``ttl_seconds``. Raises ValueError if it is not available."""
+        if not crud_sweet.take_stock(db, sweet_id=sweet_id, quantity=quantity):
+            db.rollback()
+            raise ValueError("Insufficient quantity in stock")
+        db_obj = Reservation(
+            sweet_id=sweet_id,
+            user_id=user_id,
+            quantity=quantity,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        after_commit(db, inventory_ledger.record, sweet_id, -quantity, "reserve", user_id=user_id)
+        return db_obj
+
+    def get_multi_by_user(self, db: Session, user_id: int) -> List[Reservation]:
+        return (
+            db.query(Reservation)
+            .filter(Reservation.user_id == user_id, Reservation.expires_at > datetime.now(timezone.utc))
+            .order_by(Reservation.expires_at)
+            .all()
+        )
+
+    def _take(self, db: Session, id: int, user_id: int) -> Optional[Tuple[int, int]]:
+        # DELETE ... RETURNING claims the hold atomically, so confirm, release
+        # and the sweeper can race without double-counting stock
+        return db.execute(
+            delete(Reservation)
+            .where(
+                Reservation.id == id,
+                Reservation.user_id == user_id,
+                Reservation.expires_at > datetime.now(timezone.utc),
+            )
+            .returning(Reservation.sweet_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).first()
+
+    @serialized_write
+    def confirm(self, db: Session, id: int, user_id: int) -> Optional[Tuple[int, int, int]]:
+        """Turn an active hold into a purchase. Stock was already taken at reserve time.
+
+        Returns ``(sweet_id, quantity, stock_left)``, or None if the hold does
+        not exist or has expired.
+        """
+        taken = self._take(db, id=id, user_id=user_id)
+        if taken is None:
+            db.rollback()
+            return None
+        sweet_id, quantity = taken
+        price, stock_left = db.execute(
+            select(Sweet.price, Sweet.quantity).where(Sweet.id == sweet_id)
+        ).one()
+        crud_sales.record_sale(db, sweet_id=sweet_id, units=quantity, revenue=price * quantity)
+        db.commit()
+        return sweet_id, quantity, stock_left
+
+    @serialized_write
+    def release(self, db: Session, id: int, user_id: int) -> Optional[Tuple[int, int]]:
+        """Cancel an active hold and return its stock."""
+        taken = self._take(db, id=id, user_id=user_id)
+        if taken is None:
+            db.rollback()
+            return None
+        sweet_id, quantity = taken
+        crud_sweet.return_stock(db, {sweet_id: quantity})
+        db.commit()
+        after_commit(db, inventory_ledger.record, sweet_id, quantity, "release", user_id=user_id)
+        return sweet_id, quantity
+
+    @serialized_write
+    def release_expired(self, db: Session, batch_size: int = 1000, now: Optional[datetime] = None) -> int:
+        """Release up to ``batch_size`` expired holds in one transaction.
+
+        The oldest expired rows are found through the ``expires_at`` index and
+        deleted in one statement; their stock goes back with one executemany
+        UPDATE. Returns the number of holds released.
+        """
+        now = now or datetime.now(timezone.utc)
+        expired_ids = (
+            select(Reservation.id)
+            .where(Reservation.expires_at <= now)
+            .order_by(Reservation.expires_at)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            delete(Reservation)
+            .where(Reservation.id.in_(expired_ids))
+            .returning(Reservation.sweet_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not rows:
+            db.rollback()
+            return 0
+
+        quantities: Dict[int, int] = defaultdict(int)
+        for sweet_id, quantity in rows:
+            quantities[sweet_id] += quantity
+        crud_sweet.return_stock(db, quantities)
+        db.commit()
+        for sweet_id, quantity in quantities.items():
+            after_commit(db, inventory_ledger.record, sweet_id, quantity, "expire")
+        return len(rows)
+
+
+reservation = CRUDReservation()
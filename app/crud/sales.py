@@ -0,0 +1,118 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from ..models.sales import SalesRollup
+from ..models.sweet import Sweet
+
+GRANULARITIES = ("hour", "day")
+
+
+def to_utc(at: datetime) -> datetime:
+    """Convert to an aware UTC datetime; naive values are taken to be UTC already."""
+    return at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour or day bucket."""
+    at = to_utc(at)
+    if granularity == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class CRUDSales:
+    def record_sale(
+        self, db: Session, sweet_id: int, units: int, revenue: float, at: Optional[datetime] = None
+    ) -> None:
+        """Add a sale to every rollup bucket.
+
+        Runs inside the caller's transaction and does not commit, so the rollup
+        is updated atomically with the stock change.
+        """
+        at = at or datetime.now(timezone.utc)
+        dialect = db.get_bind().dialect.name
+        for granularity in GRANULARITIES:
+            values = {
+                "sweet_id": sweet_id,
+                "granularity": granularity,
+                "bucket_start": bucket_start(at, granularity),
+                "units": units,
+                "revenue": revenue,
+            }
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(SalesRollup).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["granularity", "bucket_start", "sweet_id"],
+                    set_={
+                        "units": SalesRollup.units + stmt.excluded.units,
+                        "revenue": SalesRollup.revenue + stmt.excluded.revenue,
+                    },
+                )
+                db.execute(stmt)
+            else:
+                result = db.execute(
+                    update(SalesRollup)
+                    .where(
+                        SalesRollup.granularity == granularity,
+                        SalesRollup.bucket_start == values["bucket_start"],
+                        SalesRollup.sweet_id == sweet_id,
+                    )
+                    .values(units=SalesRollup.units + units, revenue=SalesRollup.revenue + revenue)
+                )
+                if result.rowcount == 0:
+                    db.add(SalesRollup(**values))
+                    db.flush()
+
+    def top_sellers(
+        self,
+        db: Session,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 10,
+    ) -> List[Tuple[int, Optional[str], int, float]]:
+        """Best sellers by units over ``[start, end)``, read from the rollups."""
+        units = func.sum(SalesRollup.units).label("units")
+        query = (
+            db.query(SalesRollup.sweet_id, Sweet.name, units, func.sum(SalesRollup.revenue))
+            .outerjoin(Sweet, Sweet.id == SalesRollup.sweet_id)
+            .filter(SalesRollup.granularity == granularity)
+        )
+        if start is not None:
+            query = query.filter(SalesRollup.bucket_start >= bucket_start(start, granularity))
+        if end is not None:
+            query = query.filter(SalesRollup.bucket_start < to_utc(end))
+        return (
+            query.group_by(SalesRollup.sweet_id, Sweet.name)
+            .order_by(units.desc(), SalesRollup.sweet_id)
+            .limit(limit)
+            .all()
+        )
+
+    def timeseries(
+        self,
+        db: Session,
+        granularity: str = "hour",
+        sweet_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, int, float]]:
+        """Units and revenue per bucket, for one sweet or the whole shop."""
+        query = db.query(
+            SalesRollup.bucket_start, func.sum(SalesRollup.units), func.sum(SalesRollup.revenue)
+        ).filter(SalesRollup.granularity == granularity)
+        if sweet_id is not None:
+            query = query.filter(SalesRollup.sweet_id == sweet_id)
+        if start is not None:
+            query = query.filter(SalesRollup.bucket_start >= bucket_start(start, granularity))
+        if end is not None:
+            query = query.filter(SalesRollup.bucket_start < to_utc(end))
+        return query.group_by(SalesRollup.bucket_start).order_by(SalesRollup.bucket_start).all()
+
+
+sales = CRUDSales()
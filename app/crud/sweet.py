@@ -1,22 +1,66 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List, Optional
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import or_, and_, bindparam, cast, column, func, select, update, values, Float, Integer
+from typing import Dict, List, Optional, Sequence, Tuple
 from ..models.sweet import Sweet
-from ..schemas.sweet import SweetCreate, SweetUpdate, SweetSearch
+from ..db.ledger import inventory_ledger
+from ..db.writer import after_commit, serialized_write
+from .sales import sales as crud_sales
+from .category import category as crud_category
+from ..schemas.sweet import SweetCreate, SweetUpdate, SweetSearch, BulkInventoryItem
+
+
+class VersionConflictError(Exception):
+    """The sweet was changed by someone else since the caller read it."""
 
 
 class CRUDSweet:
-    def get(self, db: Session, id: int) -> Optional[Sweet]:
-        return db.query(Sweet).filter(Sweet.id == id).first()
+    # Upper bound on bound parameters per IN (...) query
+    batch_chunk_size = 500
+    # Attempts for purchase/restock when a concurrent write bumps the version
+    max_write_retries = 5
+
+    def _query(self, db: Session, fields: Optional[Sequence[str]] = None):
+        """Base query, restricted to the given columns when ``fields`` is set."""
+        query = db.query(Sweet)
+        if fields:
+            # version is always loaded: the ETag header is built from it
+            columns = {getattr(Sweet, f) for f in fields} | {Sweet.version}
+            query = query.options(load_only(*columns))
+        return query
+
+    def get(self, db: Session, id: int, fields: Optional[Sequence[str]] = None) -> Optional[Sweet]:
+        return self._query(db, fields).filter(Sweet.id == id).first()
+
+    def get_many(self, db: Session, ids: Sequence[int]) -> Tuple[List[Sweet], List[int]]:
+        """Fetch sweets by id with one IN query per chunk.
+
+        Returns the found sweets in request order and the ids that were not found.
+        """
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        for start in range(0, len(ids), self.batch_chunk_size):
+            chunk = ids[start:start + self.batch_chunk_size]
+            for obj in db.query(Sweet).filter(Sweet.id.in_(chunk)).all():
+                found[obj.id] = obj
+
+        sweets = [found[i] for i in ids if i in found]
+        missing = [i for i in ids if i not in found]
+        return sweets, missing
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Sweet]:
-        return db.query(Sweet).offset(skip).limit(limit).all()
+    def get_multi(
+        self, db: Session, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None
+    ) -> List[Sweet]:
+        return self._query(db, fields).offset(skip).limit(limit).all()
 
+    @serialized_write
     def create(self, db: Session, obj_in: SweetCreate) -> Sweet:
+        category = crud_category.get_or_create(db, obj_in.category)
         db_obj = Sweet(
             name=obj_in.name,
             description=obj_in.description,
-            category=obj_in.category,
+            category=category.name,
+            category_id=category.id,
             price=obj_in.price,
             quantity=obj_in.quantity,
             image_url=obj_in.image_url,
@@ -24,35 +68,83 @@ class CRUDSweet:
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        after_commit(db, crud_category.cache.invalidate)
+        # Recorded even at zero stock: it is the baseline replay_ledger.py starts from
+        after_commit(db, inventory_ledger.record, db_obj.id, db_obj.quantity, "create")
         return db_obj
 
-    def update(self, db: Session, db_obj: Sweet, obj_in: SweetUpdate) -> Sweet:
+    @serialized_write
+    def update(
+        self,
+        db: Session,
+        db_obj: Sweet,
+        obj_in: SweetUpdate,
+        user_id: Optional[int] = None,
+        expected_version: Optional[int] = None,
+    ) -> Sweet:
+        """Apply changes if the sweet is still at ``expected_version``.
+
+        Raises VersionConflictError if it is not, or if another writer commits
+        first; the version check is part of the UPDATE, so no row lock is held.
+        """
+        if expected_version is not None and db_obj.version != expected_version:
+            raise VersionConflictError("Sweet has been modified")
         update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("category"):
+            category = crud_category.get_or_create(db, update_data["category"])
+            update_data["category"] = category.name
+            update_data["category_id"] = category.id
+        old_quantity = db_obj.quantity
         for field, value in update_data.items():
             setattr(db_obj, field, value)
         
         db.add(db_obj)
-        db.commit()
+        try:
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise VersionConflictError("Sweet has been modified")
         db.refresh(db_obj)
+        if "category_id" in update_data:
+            after_commit(db, crud_category.cache.invalidate)
+        if db_obj.quantity != old_quantity:
+            after_commit(
+                db, inventory_ledger.record, db_obj.id, db_obj.quantity - old_quantity, "adjustment", user_id=user_id
+            )
         return db_obj
 
-    def remove(self, db: Session, id: int) -> Optional[Sweet]:
+    @serialized_write
+    def remove(self, db: Session, id: int, user_id: Optional[int] = None) -> Optional[Sweet]:
         obj = db.query(Sweet).get(id)
         if obj:
+            quantity = obj.quantity
             db.delete(obj)
             db.commit()
+            after_commit(db, crud_category.cache.invalidate)
+            if quantity:
+                after_commit(db, inventory_ledger.record, id, -quantity, "delete", user_id=user_id)
         return obj
 
-    def search(self, db: Session, search_params: SweetSearch, skip: int = 0, limit: int = 100) -> List[Sweet]:
-        query = db.query(Sweet)
+    def search(
+        self,
+        db: Session,
+        search_params: SweetSearch,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Sweet]:
+        query = self._query(db, fields)
         
         # Filter by name (case-insensitive)
         if search_params.name:
             query = query.filter(Sweet.name.ilike(f"%{search_params.name}%"))
         
-        # Filter by category (case-insensitive)
+        # Filter by category (exact match on the indexed foreign key)
         if search_params.category:
-            query = query.filter(Sweet.category.ilike(f"%{search_params.category}%"))
+            category = crud_category.get_by_name(db, search_params.category)
+            if category is None:
+                return []
+            query = query.filter(Sweet.category_id == category.id)
         
         # Filter by price range
         if search_params.min_price is not None:
@@ -63,30 +155,146 @@ class CRUDSweet:
         
         return query.offset(skip).limit(limit).all()
 
-    def purchase(self, db: Session, sweet_id: int, quantity: int) -> Optional[Sweet]:
-        sweet = self.get(db, sweet_id)
-        if not sweet:
-            return None
-        
-        if sweet.quantity < quantity:
-            raise ValueError("Insufficient quantity in stock")
-        
-        sweet.quantity -= quantity
-        db.add(sweet)
-        db.commit()
+    @serialized_write
+    def purchase(self, db: Session, sweet_id: int, quantity: int, user_id: Optional[int] = None) -> Optional[Sweet]:
+        for attempt in range(self.max_write_retries):
+            sweet = self.get(db, sweet_id)
+            if not sweet:
+                return None
+            
+            if sweet.quantity < quantity:
+                raise ValueError("Insufficient quantity in stock")
+            
+            sweet.quantity -= quantity
+            db.add(sweet)
+            crud_sales.record_sale(db, sweet_id=sweet_id, units=quantity, revenue=sweet.price * quantity)
+            try:
+                db.commit()
+                break
+            except StaleDataError:
+                # Another writer got there first; re-read and try again
+                db.rollback()
+        else:
+            raise VersionConflictError("Sweet is being modified concurrently, try again")
         db.refresh(sweet)
+        after_commit(db, inventory_ledger.record, sweet_id, -quantity, "purchase", user_id=user_id)
         return sweet
 
-    def restock(self, db: Session, sweet_id: int, quantity: int) -> Optional[Sweet]:
-        sweet = self.get(db, sweet_id)
-        if not sweet:
-            return None
-        
-        sweet.quantity += quantity
-        db.add(sweet)
-        db.commit()
+    @serialized_write
+    def restock(self, db: Session, sweet_id: int, quantity: int, user_id: Optional[int] = None) -> Optional[Sweet]:
+        for attempt in range(self.max_write_retries):
+            sweet = self.get(db, sweet_id)
+            if not sweet:
+                return None
+            
+            sweet.quantity += quantity
+            db.add(sweet)
+            try:
+                db.commit()
+                break
+            except StaleDataError:
+                db.rollback()
+        else:
+            raise VersionConflictError("Sweet is being modified concurrently, try again")
         db.refresh(sweet)
+        after_commit(db, inventory_ledger.record, sweet_id, quantity, "restock", user_id=user_id)
         return sweet
 
+    def take_stock(self, db: Session, sweet_id: int, quantity: int) -> bool:
+        """Atomically remove stock if enough is available. Does not commit.
+
+        A single conditional UPDATE, so concurrent callers never block each
+        other or oversell. Returns False if the sweet is missing or short.
+        """
+        result = db.execute(
+            update(Sweet)
+            .where(Sweet.id == sweet_id, Sweet.quantity >= quantity)
+            .values(quantity=Sweet.quantity - quantity, version=Sweet.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def return_stock(self, db: Session, quantities: Dict[int, int]) -> None:
+        """Add stock back to many sweets with one executemany UPDATE. Does not commit."""
+        if not quantities:
+            return
+        table = Sweet.__table__
+        db.connection().execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(quantity=table.c.quantity + bindparam("b_quantity"), version=table.c.version + 1),
+            [{"b_id": id, "b_quantity": quantity} for id, quantity in quantities.items()],
+        )
+
+    @serialized_write
+    def bulk_update(
+        self, db: Session, items: Sequence[BulkInventoryItem], user_id: Optional[int] = None
+    ) -> Tuple[List[Tuple[int, int, float]], List[int]]:
+        """Apply quantity deltas and price changes to many sweets in one transaction.
+
+        PostgreSQL gets a single ``UPDATE ... FROM (VALUES ...)``; other databases
+        run one executemany UPDATE. Repeated ids are merged (deltas add up, the
+        last price wins). Raises ValueError and rolls back if any quantity would
+        go negative. Returns ``(sweet_id, quantity, price)`` rows in request
+        order and the ids that do not exist.
+        """
+        changes: Dict[int, Dict] = {}
+        for item in items:
+            change = changes.setdefault(item.sweet_id, {"id": item.sweet_id, "delta": 0, "price": None})
+            change["delta"] += item.quantity_delta or 0
+            if item.price is not None:
+                change["price"] = item.price
+        rows = list(changes.values())
+
+        if db.get_bind().dialect.name == "postgresql":
+            v = values(
+                column("id", Integer), column("delta", Integer), column("price", Float), name="v"
+            ).data([(r["id"], r["delta"], r["price"]) for r in rows])
+            db.execute(
+                update(Sweet)
+                .where(Sweet.id == v.c.id)
+                .values(
+                    quantity=Sweet.quantity + v.c.delta,
+                    price=func.coalesce(cast(v.c.price, Float), Sweet.price),
+                    version=Sweet.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            table = Sweet.__table__
+            db.connection().execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    quantity=table.c.quantity + bindparam("b_delta"),
+                    price=func.coalesce(bindparam("b_price", type_=Float), table.c.price),
+                    version=table.c.version + 1,
+                ),
+                [{"b_id": r["id"], "b_delta": r["delta"], "b_price": r["price"]} for r in rows],
+            )
+
+        found = {}
+        ids = list(changes)
+        for start in range(0, len(ids), self.batch_chunk_size):
+            chunk = ids[start:start + self.batch_chunk_size]
+            for id, quantity, price in db.execute(
+                select(Sweet.id, Sweet.quantity, Sweet.price).where(Sweet.id.in_(chunk))
+            ):
+                found[id] = (id, quantity, price)
+
+        negative = [id for id, quantity, _ in found.values() if quantity < 0]
+        if negative:
+            db.rollback()
+            raise ValueError(f"Insufficient quantity in stock for sweets: {', '.join(map(str, negative))}")
+        db.commit()
+
+        for id in found:
+            delta = changes[id]["delta"]
+            if delta:
+                reason = "restock" if delta > 0 else "adjustment"
+                after_commit(db, inventory_ledger.record, id, delta, reason, user_id=user_id)
+
+        return [found[id] for id in ids if id in found], [id for id in ids if id not in found]
+
 
-sweet = CRUDSweet()
\ No newline at end of file
+sweet = CRUDSweet()
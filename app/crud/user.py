@@ -3,6 +3,7 @@ from typing import List, Optional
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
 from ..core.security import get_password_hash, verify_password
+from ..db.writer import serialized_write
 
 
 class CRUDUser:
@@ -16,7 +17,12 @@ class CRUDUser:
         return db.query(User).offset(skip).limit(limit).all()
 
     def create(self, db: Session, obj_in: UserCreate) -> User:
+        # Hash before queuing the write so bcrypt never runs on the writer
         hashed_password = get_password_hash(obj_in.password)
+        return self._insert(db, obj_in=obj_in, hashed_password=hashed_password)
+
+    @serialized_write
+    def _insert(self, db: Session, obj_in: UserCreate, hashed_password: str) -> User:
         db_obj = User(
             email=obj_in.email,
             hashed_password=hashed_password,
@@ -34,7 +40,10 @@ class CRUDUser:
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        
+        return self._apply_update(db, db_obj=db_obj, update_data=update_data)
+
+    @serialized_write
+    def _apply_update(self, db: Session, db_obj: User, update_data: dict) -> User:
         for field, value in update_data.items():
             setattr(db_obj, field, value)
         
@@ -43,6 +52,14 @@ class CRUDUser:
         db.refresh(db_obj)
         return db_obj
 
+    @serialized_write
+    def set_admin(self, db: Session, db_obj: User, is_admin: bool = True) -> User:
+        db_obj.is_admin = is_admin
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
     def authenticate(self, db: Session, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
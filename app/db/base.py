@@ -1,6 +1,10 @@
 from .session import Base
 from ..models.user import User
+from ..models.category import Category
 from ..models.sweet import Sweet
+from ..models.inventory import InventoryMovement
+from ..models.sales import SalesRollup
+from ..models.reservation import Reservation
 
 # Import all models to ensure they are registered with SQLAlchemy
-__all__ = ["Base", "User", "Sweet"]
\ No newline at end of file
+__all__ = ["Base", "User", "Category", "Sweet", "InventoryMovement", "SalesRollup", "Reservation"]
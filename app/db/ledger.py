@@ -0,0 +1,142 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from .session import SessionLocal
+from ..core.config import settings
+from ..crud.inventory import inventory as crud_inventory
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryLedger:
+    """Write-behind buffer for inventory movements.
+
+    ``record`` only appends to an in-memory queue, so the purchase path never
+    waits on an extra INSERT. A background thread drains the queue in batched
+    inserts every ``flush_interval`` seconds, or sooner once ``batch_size``
+    entries are waiting. At most ``flush_interval`` seconds of movements
+    (bounded by ``max_pending`` entries) can be lost on a hard crash; a clean
+    shutdown through ``stop`` flushes everything.
+
+    ``record`` never writes to the database itself: it may be called from the
+    SQLite writer thread, which already holds the write lock. Once
+    ``max_pending`` movements are waiting (the database is down or flushes keep
+    failing), further movements are dropped and counted in ``dropped``. Stock
+    levels are unaffected, but the ledger no longer sums to them for those
+    sweets until ``replay_ledger.py --open-balances`` records a correcting
+    opening movement.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        max_pending: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending = deque()
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, sweet_id: int, delta: int, reason: str, user_id: Optional[int] = None) -> None:
+        """Queue a movement for the next batch, or drop it if the buffer is full."""
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                dropped = self.dropped
+                size = None
+            else:
+                self._pending.append({
+                    "sweet_id": sweet_id,
+                    "user_id": user_id,
+                    "delta": delta,
+                    "reason": reason,
+                    "created_at": datetime.now(timezone.utc),
+                })
+                size = len(self._pending)
+
+        if size is None:
+            logger.warning(
+                "Inventory ledger full (%d pending), dropped %s movement for sweet %d (%d dropped so far)",
+                self.max_pending, reason, sweet_id, dropped,
+            )
+        elif size >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Persist everything queued so far. Returns the number of rows written."""
+        with self._flush_lock:
+            written = 0
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    return written
+
+                db = self.session_factory()
+                try:
+                    crud_inventory.create_many(db, batch)
+                except Exception:
+                    db.rollback()
+                    # Put the batch back in front so ordering is preserved for the retry
+                    with self._lock:
+                        self._pending.extendleft(reversed(batch))
+                        # Movements recorded meanwhile may have pushed us past the bound
+                        overflow = max(len(self._pending) - self.max_pending, 0)
+                        for _ in range(overflow):
+                            self._pending.pop()
+                        self.dropped += overflow
+                    if overflow:
+                        logger.warning("Inventory ledger full, dropped %d newest movements", overflow)
+                    logger.exception("Failed to flush %d inventory movements", len(batch))
+                    return written
+                finally:
+                    db.close()
+                written += len(batch)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher thread."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="inventory-ledger", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread and write out anything still buffered."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+inventory_ledger = InventoryLedger(
+    flush_interval=settings.ledger_flush_interval,
+    batch_size=settings.ledger_batch_size,
+    max_pending=settings.ledger_max_pending,
+)
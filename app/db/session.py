@@ -1,18 +1,69 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.database_url)
+
+def is_sqlite_file(url: str) -> bool:
+    """True for an on-disk SQLite database (in-memory databases are per-connection)."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def create_sqlite_engine(url, begin: str, **kwargs) -> Engine:
+    """Create an engine for a SQLite file with WAL and tuning pragmas on every connection.
+
+    pysqlite's own transaction handling is switched off so SQLAlchemy emits
+    ``begin`` itself; this keeps SAVEPOINTs working and lets the writer take
+    the write lock up front with ``BEGIN IMMEDIATE``.
+    """
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql(begin)
+
+    return engine
+
+
+SQLITE_MODE = is_sqlite_file(settings.database_url)
+
+if SQLITE_MODE:
+    # Readers share a pool; WAL lets them run alongside the single writer,
+    # which app/db/writer.py creates for each SQLite file it writes to
+    engine = create_sqlite_engine(
+        settings.database_url, begin="BEGIN", pool_size=settings.sqlite_reader_pool_size
+    )
+else:
+    engine = create_engine(settings.database_url)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
 def get_db():
-    """Database dependency."""
+    """Database dependency.
+
+    Declare it with ``Depends(get_db, scope="function")`` so the session is
+    closed once the path operation's response has been built, before it is
+    sent to the client. A Session only checks out a pooled connection on its
+    first statement, so requests that never query never hold a pool slot.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,75 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from .session import SessionLocal
+from ..core.config import settings
+from ..crud.reservation import reservation as crud_reservation
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationSweeper:
+    """Background thread that releases expired cart reservations.
+
+    Every ``interval`` seconds it releases expired holds in batches of
+    ``batch_size`` until none are left, so each pass costs time proportional
+    to the number of expired holds, not the number of active ones.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = 5.0,
+        batch_size: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> int:
+        """Release every currently expired hold. Returns how many were released."""
+        released = 0
+        db = self.session_factory()
+        try:
+            while not self._stopping.is_set():
+                count = crud_reservation.release_expired(db, batch_size=self.batch_size)
+                released += count
+                if count < self.batch_size:
+                    break
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to release expired reservations")
+        finally:
+            db.close()
+        return released
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.sweep()
+
+    def start(self) -> None:
+        """Start the sweeper thread."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="reservation-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sweeper thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+
+reservation_sweeper = ReservationSweeper(
+    interval=settings.reservation_sweep_interval,
+    batch_size=settings.reservation_sweep_batch_size,
+)
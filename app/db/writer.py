@@ -0,0 +1,257 @@
+import functools
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, sessionmaker
+
+from .session import create_sqlite_engine, is_sqlite_file
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set on writer threads, so writes nested inside a queued write run in place
+_writer_thread = threading.local()
+
+
+class _GroupCommitSession:
+    """Session handed to a queued write.
+
+    The write runs inside its own SAVEPOINT, so ``commit`` and ``rollback``
+    only settle that savepoint; the real COMMIT happens once for the whole
+    group. Callbacks registered through ``after_commit`` are held until that
+    COMMIT succeeds. Everything else is delegated to the writer's session.
+    """
+
+    def __init__(self, session: Session):
+        self._session = session
+        self._savepoint = session.begin_nested()
+        self._after_commit: List[Callable[[], Any]] = []
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def commit(self) -> None:
+        self._session.flush()
+        self._savepoint.commit()
+        self._savepoint = self._session.begin_nested()
+
+    def rollback(self) -> None:
+        self._savepoint.rollback()
+        self._savepoint = self._session.begin_nested()
+        # The changes these callbacks describe were just undone
+        self._after_commit.clear()
+
+    def _finish(self) -> None:
+        self._session.flush()
+        self._savepoint.commit()
+
+    def _abort(self) -> None:
+        if self._savepoint.is_active:
+            self._savepoint.rollback()
+
+
+class SQLiteWriteQueue:
+    """Serializes every write through one connection and commits in groups.
+
+    Writers queue a function; a single thread drains up to ``batch_size``
+    queued writes, runs each in its own SAVEPOINT and commits them with one
+    COMMIT (one fsync) per group. Under load, throughput rises with the group
+    size instead of collapsing into ``database is locked`` retries.
+
+    Side effects a write performs outside the database (ledger entries, cache
+    invalidation) go through ``after_commit`` and run only once the group
+    COMMIT has succeeded; if that COMMIT fails they are discarded and every
+    write in the group gets the error. Each write's objects are expunged when
+    it finishes, so writes to the same row never share an instance.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], batch_size: int = 64):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[Tuple[Callable, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def in_writer(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def _start_locked(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+            self._thread.start()
+
+    def start(self) -> None:
+        with self._start_lock:
+            self._start_locked()
+
+    def stop(self) -> None:
+        """Finish everything already queued, then stop the writer thread."""
+        with self._start_lock:
+            if self._thread is None and self._queue.empty():
+                return
+            # Writes may have been enqueued without the thread ever starting
+            self._start_locked()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def enqueue(self, fn: Callable[[Session], Any]) -> Future:
+        """Queue ``fn(session)`` without waiting; the future settles when its group commits."""
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def submit(self, fn: Callable[[Session], Any]) -> Any:
+        """Run ``fn(session)`` on the writer and wait for its group to commit."""
+        if self.in_writer():
+            raise RuntimeError("submit() called from the writer thread")
+        self.start()
+        return self.enqueue(fn).result()
+
+    def _run(self) -> None:
+        _writer_thread.active = True
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[Callable, Future]]) -> None:
+        outcomes = []
+        callbacks: List[Callable[[], Any]] = []
+        session = self.session_factory()
+        try:
+            for fn, future in batch:
+                proxy = _GroupCommitSession(session)
+                try:
+                    result = fn(proxy)
+                    proxy._finish()
+                    callbacks.extend(proxy._after_commit)
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    proxy._abort()
+                    outcomes.append((future, None, e))
+                # Hand each write its own detached snapshot; later writes reload
+                session.expunge_all()
+            session.commit()
+        except Exception as e:
+            logger.exception("Group commit of %d writes failed", len(batch))
+            session.rollback()
+            callbacks = []
+            outcomes = [(future, None, error or e) for future, _, error in outcomes]
+            outcomes += [(future, None, e) for _, future in batch[len(outcomes):]]
+        finally:
+            session.close()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("After-commit callback failed")
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+def after_commit(db: Session, fn: Callable[..., Any], *args, **kwargs) -> None:
+    """Run ``fn(*args, **kwargs)`` once ``db``'s changes are durable.
+
+    Inside a queued write that is after the group COMMIT, and never if it
+    fails. Other sessions have already committed by the time CRUD methods
+    call this, so ``fn`` runs straight away.
+    """
+    if isinstance(db, _GroupCommitSession):
+        db._after_commit.append(functools.partial(fn, *args, **kwargs))
+    else:
+        fn(*args, **kwargs)
+
+
+def _refetch(session: Session, value: Any) -> Any:
+    """Reload ORM instances from the writer's own session."""
+    state = inspect(value, raiseerr=False)
+    if state is None or not hasattr(state, "identity") or state.identity is None:
+        return value
+    return session.get(state.mapper.class_, state.identity)
+
+
+_queues: Dict[str, SQLiteWriteQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def write_queue_for(bind) -> Optional[SQLiteWriteQueue]:
+    """The writer queue for the SQLite file ``bind`` points at, or None for other databases.
+
+    Queues are created on first use, one per database file, each with its own
+    single-connection ``BEGIN IMMEDIATE`` engine.
+    """
+    if not is_sqlite_file(bind.url):
+        return None
+    path = os.path.abspath(bind.url.database)
+    with _queues_lock:
+        write_queue = _queues.get(path)
+        if write_queue is None:
+            writer_engine = create_sqlite_engine(
+                bind.url, begin="BEGIN IMMEDIATE", pool_size=1, max_overflow=0
+            )
+            write_queue = SQLiteWriteQueue(
+                sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=writer_engine),
+                batch_size=settings.sqlite_write_batch_size,
+            )
+            _queues[path] = write_queue
+        return write_queue
+
+
+def stop_all() -> None:
+    """Drain and stop every writer queue."""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for write_queue in queues:
+        write_queue.stop()
+
+
+def serialized_write(method):
+    """Route a CRUD write method through the writer queue of the caller's database.
+
+    The queue is picked from the engine ``db`` is bound to, so dependency
+    overrides and other session factories keep writing where they read. ``db``
+    is swapped for the writer session and ORM instance arguments are reloaded
+    there. For non-SQLite databases, and for nested calls already on a writer,
+    the method runs directly.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, db, *args, **kwargs):
+        if getattr(_writer_thread, "active", False):
+            return method(self, db, *args, **kwargs)
+        write_queue = write_queue_for(db.get_bind())
+        if write_queue is None:
+            return method(self, db, *args, **kwargs)
+
+        def run(session):
+            call_args = [_refetch(session, a) for a in args]
+            call_kwargs = {k: _refetch(session, v) for k, v in kwargs.items()}
+            return method(self, session, *call_args, **call_kwargs)
+
+        return write_queue.submit(run)
+
+    return wrapper
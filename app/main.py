@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,14 +7,32 @@ from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.session import engine
 from app.db.base import Base
+from app.db.ledger import inventory_ledger
+from app.db.sweeper import reservation_sweeper
+from app.db import writer
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    inventory_ledger.start()
+    reservation_sweeper.start()
+    try:
+        yield
+    finally:
+        reservation_sweeper.stop()
+        # Flush buffered inventory movements before the process exits
+        inventory_ledger.stop()
+        writer.stop_all()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    openapi_url="/api/v1/openapi.json"
+    openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -22,6 +42,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["ETag"],
 )
 
 app.include_router(api_router, prefix="/api/v1")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from ..db.session import Base
+
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Names are unique regardless of case: "Gummies" and "gummies" are one category
+    __table_args__ = (Index("uq_categories_name_lower", func.lower(name), unique=True),)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from ..db.session import Base
+
+
+class InventoryMovement(Base):
+    """Append-only record of a stock change. Rows are never updated."""
+
+    __tablename__ = "inventory_movements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Plain integers rather than foreign keys so history survives deletes
+    sweet_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=True)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
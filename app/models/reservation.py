@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..db.session import Base
+
+
+class Reservation(Base):
+    """A timed hold on stock. Only active holds are stored; confirming or
+    releasing a hold deletes its row, so the table stays small."""
+
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sweet_id = Column(Integer, ForeignKey("sweets.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint, Index
+from ..db.session import Base
+
+
+class SalesRollup(Base):
+    """Units and revenue per sweet per time bucket, maintained on purchase."""
+
+    __tablename__ = "sales_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "sweet_id", name="uq_sales_rollup_bucket"),
+        Index("ix_sales_rollup_sweet_bucket", "sweet_id", "granularity", "bucket_start"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sweet_id = Column(Integer, nullable=False)
+    granularity = Column(String, nullable=False)  # "hour" or "day"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
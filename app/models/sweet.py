@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from ..db.session import Base
 
@@ -9,9 +9,15 @@ class Sweet(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
     description = Column(Text)
+    # Display name, kept alongside the normalized category for API responses
     category = Column(String, nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
     price = Column(Float, nullable=False)
     quantity = Column(Integer, default=0)
     image_url = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped on every ORM update; stale writes fail instead of overwriting
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
\ No newline at end of file
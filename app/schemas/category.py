@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class Category(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
+
+class CategoryWithCount(Category):
+    sweet_count: int
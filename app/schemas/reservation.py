@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class ReservationCreate(BaseModel):
+    sweet_id: int
+    quantity: int = Field(..., gt=0)
+    ttl_seconds: Optional[int] = Field(None, gt=0, description="Hold duration; defaults to the server setting")
+
+
+class Reservation(BaseModel):
+    id: int
+    sweet_id: int
+    quantity: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class TopSeller(BaseModel):
+    sweet_id: int
+    name: Optional[str] = None
+    units: int
+    revenue: float
+
+
+class SalesPoint(BaseModel):
+    bucket_start: datetime
+    units: int
+    revenue: float
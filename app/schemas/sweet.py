@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class SweetBase(BaseModel):
@@ -27,6 +27,8 @@ class SweetUpdate(BaseModel):
 
 class SweetInDBBase(SweetBase):
     id: int
+    category_id: Optional[int] = None
+    version: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -50,6 +52,19 @@ class SweetSearch(BaseModel):
     max_price: Optional[float] = Field(None, ge=0)
 
 
+# Batch fetch schemas
+MAX_BATCH_IDS = 5000  # shared by the GET ?ids= and POST body forms
+
+
+class SweetBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class SweetBatchResponse(BaseModel):
+    items: List[Sweet]
+    missing: List[int]
+
+
 # Inventory management schemas
 class PurchaseRequest(BaseModel):
     quantity: int = Field(..., gt=0)
@@ -62,4 +77,31 @@ class RestockRequest(BaseModel):
 class InventoryResponse(BaseModel):
     message: str
     sweet_id: int
-    new_quantity: int
\ No newline at end of file
+    new_quantity: int
+
+
+class BulkInventoryItem(BaseModel):
+    sweet_id: int
+    quantity_delta: Optional[int] = None
+    price: Optional[float] = Field(None, gt=0)
+
+    @model_validator(mode="after")
+    def check_has_change(self):
+        if self.quantity_delta is None and self.price is None:
+            raise ValueError("Each item needs quantity_delta or price")
+        return self
+
+
+class BulkInventoryRequest(BaseModel):
+    items: List[BulkInventoryItem] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkInventoryResult(BaseModel):
+    sweet_id: int
+    quantity: int
+    price: float
+
+
+class BulkInventoryResponse(BaseModel):
+    items: List[BulkInventoryResult]
+    missing: List[int]
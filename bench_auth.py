@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Auth overhead micro-benchmark.
+Times verify_token per request with the verified-token cache disabled
+(full jwt.decode every time) and enabled (one decode, then cache hits).
+"""
+import argparse
+import timeit
+
+from app.core import security
+
+
+def bench(iterations: int) -> None:
+    token = security.create_access_token({"sub": "1"})
+
+    security.token_cache.clear()
+    uncached = timeit.timeit(lambda: security.decode_token(token), number=iterations)
+
+    security.token_cache.clear()
+    cached = timeit.timeit(lambda: security.verify_token(token), number=iterations)
+
+    print(f"iterations:        {iterations}")
+    print(f"without cache:     {uncached / iterations * 1e6:8.2f} us/request")
+    print(f"with cache:        {cached / iterations * 1e6:8.2f} us/request")
+    print(f"speedup:           {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    bench(args.iterations)
@@ -15,6 +15,7 @@ const EditSweet: React.FC = () => {
     quantity: 0,
     image_url: '',
   });
+  const [version, setVersion] = useState<number | null>(null);
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -35,6 +36,7 @@ const EditSweet: React.FC = () => {
         quantity: sweet.quantity,
         image_url: sweet.image_url,
       });
+      setVersion(sweet.version);
     } catch (error: any) {
       toast.error('Failed to fetch sweet');
     }
@@ -48,10 +50,17 @@ const EditSweet: React.FC = () => {
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     try {
-      await api.put(`/sweets/${id}`, sweetData);
+      await api.put(`/sweets/${id}`, sweetData, {
+        headers: { 'If-Match': `"${version}"` },
+      });
       toast.success('Sweet updated successfully!');
       navigate(`/sweets/${id}`);
     } catch (error: any) {
+      if (error.response?.status === 412) {
+        toast.error('This sweet was changed by someone else. Reloaded the latest version.');
+        fetchSweet();
+        return;
+      }
       toast.error(error.response?.data?.detail || 'Failed to update sweet');
     }
   };
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import {
   Card,
   Input,
+  Select,
   Button,
   Tag,
   Modal,
@@ -23,7 +24,7 @@ import {
 } from '@ant-design/icons';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import type { Sweet, SweetSearch } from '../types/models';
+import type { Category, Sweet, SweetSearch } from '../types/models';
 import api from '../api/api';
 
 const { Title } = Typography;
@@ -33,6 +34,7 @@ const SweetsList: React.FC = () => {
   const [sweets, setSweets] = useState<Sweet[]>([]);
   const [loading, setLoading] = useState(true);
   const [search, setSearch] = useState<SweetSearch>({});
+  const [categories, setCategories] = useState<Category[]>([]);
   const [deleteModal, setDeleteModal] = useState<{ open: boolean; sweet: Sweet | null }>({ open: false, sweet: null });
   const [purchaseModal, setPurchaseModal] = useState<{ open: boolean; sweet: Sweet | null }>({ open: false, sweet: null });
   const [purchaseQuantities, setPurchaseQuantities] = useState<Map<number, number>>(new Map());
@@ -57,6 +59,12 @@ const SweetsList: React.FC = () => {
     fetchSweets();
   }, [search]);
 
+  useEffect(() => {
+    api.get<Category[]>('/categories/')
+      .then((response) => setCategories(response.data))
+      .catch(() => message.error('Failed to fetch categories'));
+  }, []);
+
   const fetchSweets = async () => {
     setLoading(true);
     try {
@@ -66,7 +74,9 @@ const SweetsList: React.FC = () => {
       if (search.min_price) params.append('min_price', search.min_price.toString());
       if (search.max_price) params.append('max_price', search.max_price.toString());
 
-      const response = await api.get(`/sweets${params.toString() ? `?${params.toString()}` : ''}`);
+      // Filters are only honoured by the search endpoint
+      const query = params.toString();
+      const response = await api.get(query ? `/sweets/search?${query}` : '/sweets/');
       setSweets(response.data);
     } catch (error: any) {
       message.error('Failed to fetch sweets');
@@ -141,10 +151,12 @@ const SweetsList: React.FC = () => {
                   />
                 </Col>
                 <Col xs={24} sm={12} md={6}>
-                  <Input
+                  <Select
                     placeholder="Category"
-                    onChange={(e) => handleSearchChange('category', e.target.value)}
-                    style={{ borderRadius: '8px' }}
+                    allowClear
+                    options={categories.map((category) => ({ value: category.name, label: category.name }))}
+                    onChange={(value?: string) => handleSearchChange('category', value ?? '')}
+                    style={{ width: '100%' }}
                   />
                 </Col>
                 <Col xs={24} sm={12} md={6}>
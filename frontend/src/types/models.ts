@@ -8,6 +8,7 @@ export interface Sweet {
   price: number;
   quantity: number;
   image_url?: string;
+  version: number;
   created_at: string;
   updated_at?: string;
 }
@@ -37,6 +38,12 @@ export interface SweetSearch {
   max_price?: number;
 }
 
+export interface Category {
+  id: number;
+  name: string;
+  sweet_count: number;
+}
+
 export interface User {
   id: number;
   email: string;
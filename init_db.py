@@ -6,6 +6,7 @@ Creates an admin user and some sample data.
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal, engine
 from app.db.base import Base
+from app.db.ledger import inventory_ledger
 from app.crud import user as crud_user
 from app.crud import sweet as crud_sweet
 from app.schemas.user import UserCreate
@@ -33,9 +34,7 @@ def init_db() -> None:
             )
             user = crud_user.user.create(db, obj_in=admin_user)
             # Make user admin
-            user.is_admin = True
-            db.add(user)
-            db.commit()
+            user = crud_user.user.set_admin(db, db_obj=user)
             print(f"Admin user created with email: {settings.admin_email}")
         else:
             print("Admin user already exists")
@@ -92,6 +91,8 @@ def init_db() -> None:
             else:
                 print(f"Sweet already exists: {sweet_data.name}")
 
+        # Opening stock is recorded in the inventory ledger
+        inventory_ledger.flush()
     finally:
         db.close()
 
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Category normalization migration.
+Creates the categories table, adds sweets.category_id, and backfills it from
+the existing free-form sweets.category strings. Safe to run more than once.
+"""
+from sqlalchemy import inspect, text
+
+from app.db.session import engine
+from app.db.base import Base
+
+
+def migrate() -> None:
+    """Create and backfill the normalized category columns."""
+    # Creates the categories table (and any other missing tables)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        columns = {c["name"] for c in inspect(conn).get_columns("sweets")}
+        if "category_id" not in columns:
+            conn.execute(text("ALTER TABLE sweets ADD COLUMN category_id INTEGER REFERENCES categories(id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_sweets_category_id ON sweets (category_id)"))
+            print("Added sweets.category_id")
+
+        # Fold categories that differ only in case into the oldest one
+        conn.execute(text(
+            "UPDATE sweets SET category_id = "
+            "(SELECT MIN(c2.id) FROM categories c1 JOIN categories c2 ON LOWER(c2.name) = LOWER(c1.name) "
+            "WHERE c1.id = sweets.category_id) "
+            "WHERE category_id IS NOT NULL"
+        ))
+        merged = conn.execute(text(
+            "DELETE FROM categories WHERE id NOT IN (SELECT MIN(id) FROM categories GROUP BY LOWER(name))"
+        )).rowcount
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_categories_name_lower ON categories (LOWER(name))"
+        ))
+
+        inserted = conn.execute(text(
+            "INSERT INTO categories (name) "
+            "SELECT MIN(TRIM(category)) FROM sweets "
+            "WHERE LOWER(TRIM(category)) NOT IN (SELECT LOWER(name) FROM categories) "
+            "GROUP BY LOWER(TRIM(category))"
+        )).rowcount
+        updated = conn.execute(text(
+            "UPDATE sweets SET category_id = "
+            "(SELECT id FROM categories WHERE LOWER(categories.name) = LOWER(TRIM(sweets.category))) "
+            "WHERE category_id IS NULL"
+        )).rowcount
+        print(f"Merged {merged} duplicate categories, created {inserted}, linked {updated} sweets")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Sweet version column migration.
+Adds sweets.version (used for optimistic concurrency and ETags) to databases
+created before it existed. Existing rows start at version 1. Safe to run more
+than once.
+"""
+from sqlalchemy import inspect, text
+
+from app.db.session import engine
+
+
+def migrate() -> None:
+    """Add the version column if it is missing."""
+    with engine.begin() as conn:
+        columns = {c["name"] for c in inspect(conn).get_columns("sweets")}
+        if "version" in columns:
+            print("sweets.version already exists")
+            return
+        conn.execute(text("ALTER TABLE sweets ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+        print("Added sweets.version")
+
+
+if __name__ == "__main__":
+    migrate()
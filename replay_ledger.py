@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Inventory ledger replay script.
+Recomputes every sweet's quantity from the inventory movement ledger and
+reports any sweet whose stored quantity differs.
+
+Stop the API before using --open-balances or --apply: movements still
+buffered in a running API process are not in the ledger yet, so both would
+act on totals that are about to change.
+
+--open-balances treats stored stock as correct and records an "opening"
+movement for every sweet whose ledger disagrees with it, including sweets
+that predate the ledger and sweets whose movements were dropped.
+
+--apply does the opposite and overwrites stored stock with ledger totals.
+The ledger is lossy (see LEDGER_MAX_PENDING), so this needs --force and is
+only meant for recovering stock known to be wrong.
+"""
+import argparse
+import sys
+from datetime import datetime, timezone
+
+from app.db.session import SessionLocal, engine
+from app.db.base import Base
+from app.db.ledger import inventory_ledger
+from app.crud import inventory as crud_inventory
+from app.models.sweet import Sweet
+
+
+def replay(apply: bool = False, open_balances: bool = False) -> int:
+    """Compare stored quantities with the ledger. Returns the number of mismatches."""
+    Base.metadata.create_all(bind=engine)
+    # Only this process's buffer; a running API's buffer is out of reach
+    inventory_ledger.flush()
+
+    db = SessionLocal()
+    try:
+        expected = crud_inventory.inventory.replay(db)
+        baselined = crud_inventory.inventory.baselined_sweet_ids(db)
+        mismatches = 0
+        corrected = 0
+        openings = []
+        for sweet in db.query(Sweet).order_by(Sweet.id).all():
+            ledger_quantity = expected.get(sweet.id, 0)
+            if sweet.id not in baselined:
+                print(f"Sweet {sweet.id} ({sweet.name}): no opening balance in ledger")
+            elif sweet.quantity != ledger_quantity:
+                print(f"Sweet {sweet.id} ({sweet.name}): stored={sweet.quantity} ledger={ledger_quantity}")
+            else:
+                continue
+            mismatches += 1
+            if open_balances:
+                openings.append({
+                    "sweet_id": sweet.id,
+                    "user_id": None,
+                    "delta": sweet.quantity - ledger_quantity,
+                    "reason": "opening",
+                    "created_at": datetime.now(timezone.utc),
+                })
+            elif apply and sweet.id in baselined:
+                sweet.quantity = ledger_quantity
+                db.add(sweet)
+                corrected += 1
+        if corrected:
+            db.commit()
+            print(f"Corrected {corrected} sweet(s)")
+        if openings:
+            crud_inventory.inventory.create_many(db, openings)
+            print(f"Recorded opening balances for {len(openings)} sweet(s)")
+        return mismatches
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--open-balances",
+        action="store_true",
+        help="Record opening movements so the ledger matches stored stock",
+    )
+    mode.add_argument("--apply", action="store_true", help="Overwrite stored quantities with ledger totals")
+    parser.add_argument("--force", action="store_true", help="Required with --apply")
+    args = parser.parse_args()
+    if args.apply and not args.force:
+        sys.exit(
+            "--apply overwrites stock with ledger totals, which miss dropped movements and anything "
+            "still buffered in a running API. Stop the API, check the ledger, and pass --force to proceed."
+        )
+    count = replay(apply=args.apply, open_balances=args.open_balances)
+    if not count:
+        print("All quantities match the ledger")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Synthetic data seeding script.
+Generates large numbers of sweets and users for load, search and pagination
+testing. Output is deterministic for a given --seed.
+
+Rows are written with bulk INSERTs in chunks, and every seeded user shares one
+password hash computed up front, so seeding a million users costs a single
+bcrypt call.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Dict, Iterator, List
+
+from sqlalchemy import insert, select
+
+from app.db.session import engine
+from app.db.base import Base
+from app.models.category import Category
+from app.models.inventory import InventoryMovement
+from app.models.sweet import Sweet
+from app.models.user import User
+from app.core.security import get_password_hash
+
+# Category -> (min price, max price). Listed from most to least popular;
+# categories are drawn with Zipfian weights in this order.
+CATEGORIES = {
+    "Chocolates": (150, 2500),
+    "Candies": (20, 400),
+    "Cookies": (100, 900),
+    "Cakes": (800, 4500),
+    "Cupcakes": (200, 700),
+    "Gummies": (50, 500),
+    "Pastries": (150, 1200),
+    "Pies": (600, 2500),
+    "Tarts": (400, 1800),
+    "Lollipops": (10, 150),
+    "Fudge": (200, 1200),
+    "Toffees": (50, 600),
+    "Marshmallows": (80, 500),
+    "Brownies": (150, 800),
+    "Macarons": (250, 1500),
+    "Ice Cream": (150, 1000),
+}
+
+ADJECTIVES = [
+    "Classic", "Double", "Salted", "Dark", "Milk", "White", "Spiced", "Honey",
+    "Roasted", "Crunchy", "Chewy", "Frosted", "Golden", "Tangy", "Creamy", "Mini",
+]
+FLAVORS = [
+    "Chocolate", "Caramel", "Vanilla", "Strawberry", "Lemon", "Raspberry", "Hazelnut",
+    "Mango", "Pistachio", "Coconut", "Mint", "Cherry", "Almond", "Coffee", "Orange",
+    "Blueberry", "Peanut Butter", "Cinnamon", "Maple", "Toffee",
+]
+
+SEED_PASSWORD = "seedpassword"
+
+
+def zipf_weights(n: int, s: float) -> List[float]:
+    """Cumulative Zipf weights for ranks 1..n, for random.choices(cum_weights=...)."""
+    return list(accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def chunked(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ensure_categories() -> Dict[str, int]:
+    """Insert any missing seed categories and return name -> id."""
+    with engine.begin() as conn:
+        existing = dict(conn.execute(select(Category.name, Category.id)).all())
+        missing = [{"name": name} for name in CATEGORIES if name not in existing]
+        if missing:
+            conn.execute(insert(Category), missing)
+        return dict(conn.execute(select(Category.name, Category.id)).all())
+
+
+def generate_sweets(
+    rng: random.Random, count: int, seed: int, category_ids: Dict[str, int], zipf_s: float
+) -> Iterator[dict]:
+    names = list(CATEGORIES)
+    category_weights = zipf_weights(len(names), zipf_s)
+    for i in range(count):
+        category = rng.choices(names, cum_weights=category_weights)[0]
+        low, high = CATEGORIES[category]
+        # Log-uniform prices: cheap items are more common than expensive ones
+        price = round(low * (high / low) ** rng.random(), 2)
+        flavor = rng.choice(FLAVORS)
+        # Heavy-tailed stock levels: a few best sellers are stocked deeply
+        quantity = min(int(rng.paretovariate(1.2) * 5) - 5, 5000)
+        yield {
+            "name": f"{rng.choice(ADJECTIVES)} {flavor} {category} #{i + 1}",
+            "description": f"{flavor} flavoured {category.lower()} from seed batch {seed}.",
+            "category": category,
+            "category_id": category_ids[category],
+            "price": price,
+            "quantity": max(quantity, 0),
+            "image_url": None,
+        }
+
+
+def generate_users(rng: random.Random, count: int, seed: int, hashed_password: str) -> Iterator[dict]:
+    first_names = ["Asha", "Ben", "Chen", "Dana", "Eli", "Farah", "Gita", "Hugo", "Ines", "Jin", "Kai", "Lena"]
+    last_names = ["Patel", "Smith", "Wang", "Garcia", "Kumar", "Okafor", "Rossi", "Novak", "Sato", "Silva"]
+    for i in range(count):
+        yield {
+            "email": f"seed{seed}-user{i + 1}@example.com",
+            "hashed_password": hashed_password,
+            "full_name": f"{rng.choice(first_names)} {rng.choice(last_names)}",
+            "is_active": rng.random() > 0.02,
+            "is_admin": False,
+        }
+
+
+def seed(sweets: int, users: int, seed: int, chunk_size: int, zipf_s: float) -> None:
+    """Seed sweets and users for ``seed``. Each part is skipped if that seed already wrote it."""
+    Base.metadata.create_all(bind=engine)
+    category_ids = ensure_categories()
+
+    if sweets:
+        # Same seed, same first row: if it is already there, this batch was seeded before
+        first = next(generate_sweets(random.Random(seed), 1, seed, category_ids, zipf_s))
+        with engine.connect() as conn:
+            already_seeded = conn.execute(
+                select(Sweet.id).where(Sweet.name == first["name"], Sweet.description == first["description"])
+            ).first()
+        if already_seeded:
+            print(f"Sweets for seed {seed} already exist, skipping sweets")
+            sweets = 0
+
+    started = time.perf_counter()
+    written = 0
+    rng = random.Random(seed)
+    for chunk in chunked(generate_sweets(rng, sweets, seed, category_ids, zipf_s), chunk_size):
+        with engine.begin() as conn:
+            ids = conn.execute(
+                insert(Sweet).returning(Sweet.id, sort_by_parameter_order=True), chunk
+            ).scalars().all()
+            # Opening stock goes to the inventory ledger so replay_ledger.py agrees
+            now = datetime.now(timezone.utc)
+            movements = [
+                {"sweet_id": id, "user_id": None, "delta": row["quantity"], "reason": "create", "created_at": now}
+                for id, row in zip(ids, chunk)
+            ]
+            conn.execute(insert(InventoryMovement), movements)
+        written += len(chunk)
+        print(f"sweets: {written}/{sweets}", end="\r")
+    if sweets:
+        print(f"sweets: {written} in {time.perf_counter() - started:.1f}s")
+
+    if users:
+        with engine.connect() as conn:
+            first_email = f"seed{seed}-user1@example.com"
+            if conn.execute(select(User.id).where(User.email == first_email)).first():
+                print(f"Users for seed {seed} already exist, skipping users")
+                return
+        hashed_password = get_password_hash(SEED_PASSWORD)
+        started = time.perf_counter()
+        written = 0
+        # Separate stream so users come out the same whether or not sweets were skipped
+        rng = random.Random(f"users-{seed}")
+        for chunk in chunked(generate_users(rng, users, seed, hashed_password), chunk_size):
+            with engine.begin() as conn:
+                conn.execute(insert(User), chunk)
+            written += len(chunk)
+            print(f"users: {written}/{users}", end="\r")
+        print(f"users: {written} in {time.perf_counter() - started:.1f}s (password: {SEED_PASSWORD})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sweets", type=int, default=10000, help="Number of sweets to generate")
+    parser.add_argument("--users", type=int, default=1000, help="Number of users to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; same seed, same data")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for category popularity")
+    args = parser.parse_args()
+    seed(args.sweets, args.users, args.seed, args.chunk_size, args.zipf)
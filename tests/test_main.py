@@ -1,10 +1,26 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from fastapi import HTTPException, Response
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 from app.db.session import get_db, Base
+from app.crud import inventory as crud_inventory
+from app.crud import reservation as crud_reservation
+from app.crud import sweet as crud_sweet
+from app.crud import user as crud_user
+from app.db.ledger import inventory_ledger
+from app.db.writer import write_queue_for
+from app.models.category import Category
+from app.core.config import settings
+from app.core.security import VerifiedTokenCache, create_access_token, token_cache, verify_token
+from app.core.rate_limit import login_throttle, LoginThrottle, TokenBucketLimiter, SharedStoreRateLimitBackend
+from app.schemas.sweet import SweetCreate
 
 
 # Create test database
@@ -22,6 +38,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+inventory_ledger.session_factory = TestingSessionLocal
 client = TestClient(app)
 
 
@@ -82,4 +99,510 @@ def test_login_user(setup_database):
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
-    assert data["token_type"] == "bearer"
\ No newline at end of file
+    assert data["token_type"] == "bearer"
+
+
+def test_validation_failure_never_checks_out_connection(setup_database):
+    checkouts = []
+
+    def on_checkout(*args):
+        checkouts.append(1)
+
+    event.listen(engine, "checkout", on_checkout)
+    try:
+        response = client.post("/api/v1/auth/login", json={"email": "not-an-email"})
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+    assert response.status_code == 422
+    assert checkouts == []
+
+
+def test_connection_released_before_response_is_sent(setup_database, monkeypatch):
+    headers = _auth_headers()
+    checked_out_at_send = []
+    original = Response.__call__
+
+    async def probe(self, scope, receive, send):
+        checked_out_at_send.append(engine.pool.checkedout())
+        await original(self, scope, receive, send)
+
+    monkeypatch.setattr(Response, "__call__", probe)
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert checked_out_at_send == [0]
+
+
+def _auth_headers(email="shopper@example.com", password="shopperpassword"):
+    client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "password": password, "full_name": "Shopper"}
+    )
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def _admin_headers(email="admin@example.com", password="adminpassword"):
+    headers = _auth_headers(email=email, password=password)
+    db = TestingSessionLocal()
+    try:
+        admin = crud_user.user.get_by_email(db, email=email)
+        admin.is_admin = True
+        db.commit()
+    finally:
+        db.close()
+    return headers
+
+
+def _create_sweets(*names):
+    db = TestingSessionLocal()
+    try:
+        sweets = [
+            crud_sweet.sweet.create(
+                db, obj_in=SweetCreate(name=name, category="Candy", price=1.5, quantity=10)
+            )
+            for name in names
+        ]
+        return [s.id for s in sweets]
+    finally:
+        db.close()
+
+
+def test_batch_read_sweets(setup_database):
+    headers = _auth_headers()
+    first, second = _create_sweets("Toffee", "Fudge")
+
+    response = client.get(f"/api/v1/sweets/batch?ids={second},999999,{first}", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["id"] for s in data["items"]] == [second, first]
+    assert data["missing"] == [999999]
+
+    response = client.post("/api/v1/sweets/batch", json={"ids": [first]}, headers=headers)
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()["items"]] == ["Toffee"]
+
+    response = client.get("/api/v1/sweets/batch?ids=1,abc", headers=headers)
+    assert response.status_code == 400
+
+
+def test_sparse_fieldsets(setup_database):
+    headers = _auth_headers()
+    (sweet_id,) = _create_sweets("Nougat")
+
+    response = client.get(f"/api/v1/sweets/{sweet_id}?fields=name,price", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": sweet_id, "name": "Nougat", "price": 1.5}
+
+    response = client.get("/api/v1/sweets/search?name=Nougat&fields=name,quantity", headers=headers)
+    assert response.json() == [{"id": sweet_id, "name": "Nougat", "quantity": 10}]
+
+    response = client.get("/api/v1/sweets/?fields=name,secret", headers=headers)
+    assert response.status_code == 400
+
+
+def test_inventory_ledger_replay(setup_database):
+    headers = _auth_headers()
+    (sweet_id,) = _create_sweets("Marzipan")
+
+    response = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 3}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["new_quantity"] == 7
+
+    inventory_ledger.flush()
+    assert inventory_ledger.pending == 0
+
+    db = TestingSessionLocal()
+    try:
+        movements = crud_inventory.inventory.get_for_sweet(db, sweet_id=sweet_id)
+        assert [(m.delta, m.reason) for m in movements] == [(10, "create"), (-3, "purchase")]
+        assert crud_inventory.inventory.replay(db, sweet_id=sweet_id) == {sweet_id: 7}
+    finally:
+        db.close()
+
+
+def test_inventory_ledger_drops_when_full(monkeypatch):
+    monkeypatch.setattr(inventory_ledger, "max_pending", 0)
+    dropped = inventory_ledger.dropped
+    inventory_ledger.record(1, -1, "purchase")
+    assert inventory_ledger.dropped == dropped + 1
+    assert inventory_ledger.pending == 0
+
+
+def test_sales_rollups(setup_database):
+    headers = _auth_headers()
+    admin_headers = _admin_headers()
+    popular, quiet = _create_sweets("Gumdrop", "Licorice")
+
+    for sweet_id, quantity in [(popular, 2), (quiet, 1), (popular, 3)]:
+        client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": quantity}, headers=headers)
+
+    response = client.get("/api/v1/sales/top?limit=1", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == [{"sweet_id": popular, "name": "Gumdrop", "units": 5, "revenue": 7.5}]
+
+    response = client.get(f"/api/v1/sales/timeseries?granularity=day&sweet_id={quiet}", headers=admin_headers)
+    assert [p["units"] for p in response.json()] == [1]
+
+    # The current hour's bucket, expressed in another timezone, is an exclusive end
+    this_hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end = this_hour.astimezone(timezone(timedelta(hours=5))).isoformat()
+    response = client.get(
+        "/api/v1/sales/timeseries",
+        params={"granularity": "hour", "sweet_id": quiet, "end": end},
+        headers=admin_headers,
+    )
+    assert response.json() == []
+
+    assert client.get("/api/v1/sales/top", headers=headers).status_code == 403
+
+
+def test_login_throttling(setup_database):
+    _auth_headers(email="throttled@example.com", password="rightpassword")
+    rejected_before = login_throttle.counters["rejected"]
+
+    for _ in range(settings.login_email_max_attempts):
+        response = client.post(
+            "/api/v1/auth/login", json={"email": "throttled@example.com", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    response = client.post(
+        "/api/v1/auth/login", json={"email": "throttled@example.com", "password": "rightpassword"}
+    )
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert login_throttle.counters["rejected"] == rejected_before + 1
+
+
+def test_token_bucket_refills():
+    now = [0.0]
+    limiter = TokenBucketLimiter(2, 10, backend=SharedStoreRateLimitBackend(), clock=lambda: now[0])
+    assert limiter.acquire("k")
+    assert limiter.acquire("k")
+    assert not limiter.acquire("k")
+    assert limiter.retry_after("k") == 10
+    limiter.refund("k")
+    assert limiter.acquire("k")
+    now[0] = 10.0
+    assert limiter.acquire("k")
+    assert not limiter.acquire("k")
+
+
+def test_login_throttle_charges_attempts_up_front():
+    throttle = LoginThrottle(TokenBucketLimiter(100, 60), TokenBucketLimiter(3, 60))
+    # Three attempts in flight at once use up the bucket before any of them fails
+    for _ in range(3):
+        throttle.acquire("10.0.0.1", "burst@example.com")
+    with pytest.raises(HTTPException) as exc_info:
+        throttle.acquire("10.0.0.1", "burst@example.com")
+    assert exc_info.value.status_code == 429
+
+    throttle.record_success("10.0.0.1", "burst@example.com")
+    throttle.acquire("10.0.0.1", "Burst@example.com")
+
+
+def test_shared_rate_limit_backend_uses_wall_clock():
+    assert TokenBucketLimiter(1, 10, backend=SharedStoreRateLimitBackend()).clock is time.time
+    assert TokenBucketLimiter(1, 10).clock is time.monotonic
+
+
+def test_verified_token_cache_respects_expiry():
+    cache = VerifiedTokenCache(maxsize=2)
+    now = int(time.time())
+    cache.set("live", {"sub": "1", "exp": now + 60})
+    cache.set("stale", {"sub": "2", "exp": now - 1})
+    cache.set("no-exp", {"sub": "3"})
+    assert cache.get("live")["sub"] == "1"
+    assert cache.get("stale") is None
+    assert cache.get("no-exp") is None
+
+    token = create_access_token({"sub": "42"})
+    assert verify_token(token)["sub"] == "42"
+    assert token_cache.get(token)["sub"] == "42"
+
+
+def test_categories_listing_and_exact_search(setup_database):
+    headers = _auth_headers()
+    db = TestingSessionLocal()
+    try:
+        for name, category in [("Sour Worms", "Gummies"), ("Cola Bottles", "gummies "), ("Gummy Pie", "Pies")]:
+            crud_sweet.sweet.create(db, obj_in=SweetCreate(name=name, category=category, price=1.0))
+    finally:
+        db.close()
+
+    response = client.get("/api/v1/categories/", headers=headers)
+    assert response.status_code == 200
+    counts = {c["name"]: c["sweet_count"] for c in response.json()}
+    assert counts["Gummies"] == 2
+
+    assert "gummies" not in counts
+
+    for category in ("Gummies", "gummies"):
+        response = client.get(f"/api/v1/sweets/search?category={category}", headers=headers)
+        assert sorted(s["name"] for s in response.json()) == ["Cola Bottles", "Sour Worms"]
+    response = client.get("/api/v1/sweets/search?category=Gumm", headers=headers)
+    assert response.json() == []
+
+
+def test_bulk_update_sweets(setup_database):
+    admin_headers = _admin_headers()
+    first, second = _create_sweets("Rock Candy", "Taffy")
+
+    response = client.post(
+        "/api/v1/sweets/bulk-update",
+        json={"items": [
+            {"sweet_id": second, "quantity_delta": 5},
+            {"sweet_id": first, "price": 2.25},
+            {"sweet_id": second, "quantity_delta": -2},
+            {"sweet_id": 999999, "quantity_delta": 1},
+        ]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"] == [
+        {"sweet_id": second, "quantity": 13, "price": 1.5},
+        {"sweet_id": first, "quantity": 10, "price": 2.25},
+    ]
+    assert data["missing"] == [999999]
+
+    response = client.post(
+        "/api/v1/sweets/bulk-update",
+        json={"items": [{"sweet_id": first, "quantity_delta": 5}, {"sweet_id": second, "quantity_delta": -100}]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
+    response = client.get(f"/api/v1/sweets/{first}?fields=quantity", headers=admin_headers)
+    assert response.json()["quantity"] == 10
+
+
+def test_update_sweet_requires_matching_etag(setup_database):
+    admin_headers = _admin_headers()
+    (sweet_id,) = _create_sweets("Brittle")
+
+    response = client.get(f"/api/v1/sweets/{sweet_id}", headers=admin_headers)
+    etag = response.headers["ETag"]
+    assert response.json()["version"] == 1
+
+    response = client.put(f"/api/v1/sweets/{sweet_id}", json={"price": 3.0}, headers=admin_headers)
+    assert response.status_code == 428
+
+    response = client.put(
+        f"/api/v1/sweets/{sweet_id}", json={"price": 3.0}, headers={**admin_headers, "If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+    # A second writer still holding the old ETag loses
+    response = client.put(
+        f"/api/v1/sweets/{sweet_id}", json={"price": 4.0}, headers={**admin_headers, "If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert client.get(f"/api/v1/sweets/{sweet_id}", headers=admin_headers).json()["price"] == 3.0
+
+
+def test_sparse_detail_etag_needs_no_extra_query(setup_database):
+    headers = _auth_headers()
+    (sweet_id,) = _create_sweets("Honeycomb")
+    sweet_queries = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM sweets" in statement:
+            sweet_queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        response = client.get(f"/api/v1/sweets/{sweet_id}?fields=name", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    assert response.headers["ETag"] == '"1"'
+    assert response.json() == {"id": sweet_id, "name": "Honeycomb"}
+    assert len(sweet_queries) == 1
+
+
+def test_reservations_hold_confirm_and_expire(setup_database):
+    headers = _auth_headers()
+    held, expiring = _create_sweets("Praline", "Caramel")
+
+    response = client.post("/api/v1/reservations/", json={"sweet_id": held, "quantity": 4}, headers=headers)
+    assert response.status_code == 201
+    reservation_id = response.json()["id"]
+    assert client.get(f"/api/v1/sweets/{held}?fields=quantity", headers=headers).json()["quantity"] == 6
+
+    response = client.post(f"/api/v1/reservations/{reservation_id}/confirm", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["new_quantity"] == 6
+    assert client.post(f"/api/v1/reservations/{reservation_id}/confirm", headers=headers).status_code == 404
+
+    response = client.post("/api/v1/reservations/", json={"sweet_id": held, "quantity": 7}, headers=headers)
+    assert response.status_code == 400
+
+    client.post("/api/v1/reservations/", json={"sweet_id": expiring, "quantity": 3}, headers=headers)
+    db = TestingSessionLocal()
+    try:
+        later = datetime.now(timezone.utc) + timedelta(hours=2)
+        assert crud_reservation.reservation.release_expired(db, now=later) >= 1
+    finally:
+        db.close()
+    assert client.get(f"/api/v1/sweets/{expiring}?fields=quantity", headers=headers).json()["quantity"] == 10
+
+
+@pytest.fixture
+def sqlite_file(tmp_path):
+    """A fresh SQLite file database with its own writer queue."""
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=file_engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+    write_queue_for(file_engine).stop()
+    file_engine.dispose()
+
+
+def test_writer_serializes_concurrent_purchases(sqlite_file, monkeypatch):
+    inventory_ledger.flush()
+    monkeypatch.setattr(inventory_ledger, "session_factory", sqlite_file)
+    db = sqlite_file()
+    try:
+        sweet_id = crud_sweet.sweet.create(
+            db, obj_in=SweetCreate(name="Jelly Bean", category="Candy", price=1.0, quantity=50)
+        ).id
+    finally:
+        db.close()
+
+    errors = []
+
+    def buy():
+        db = sqlite_file()
+        try:
+            crud_sweet.sweet.purchase(db, sweet_id=sweet_id, quantity=3)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=buy) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    inventory_ledger.flush()
+    db = sqlite_file()
+    try:
+        assert crud_sweet.sweet.get(db, sweet_id).quantity == 20
+        assert crud_inventory.inventory.replay(db, sweet_id=sweet_id) == {sweet_id: 20}
+    finally:
+        db.close()
+
+
+def test_writer_rolls_back_only_the_failing_write(sqlite_file):
+    write_queue = write_queue_for(sqlite_file.kw["bind"])
+
+    def add(name, fail=False):
+        def write(session):
+            session.add(Category(name=name))
+            session.flush()
+            if fail:
+                raise ValueError(name)
+            session.commit()
+            return name
+        return write
+
+    # Queued before the writer starts, so all three land in one group commit
+    futures = [
+        write_queue.enqueue(add("Kept")),
+        write_queue.enqueue(add("Lost", fail=True)),
+        write_queue.enqueue(add("Also kept")),
+    ]
+    write_queue.stop()
+
+    assert futures[0].result() == "Kept"
+    assert futures[2].result() == "Also kept"
+    with pytest.raises(ValueError):
+        futures[1].result()
+    db = sqlite_file()
+    try:
+        assert sorted(c.name for c in db.query(Category).all()) == ["Also kept", "Kept"]
+    finally:
+        db.close()
+
+
+def test_writer_stop_drains_queue(sqlite_file):
+    write_queue = write_queue_for(sqlite_file.kw["bind"])
+    write_queue.start()
+    futures = [
+        write_queue.enqueue(lambda session, i=i: session.add(Category(name=f"Drained {i}")) or i)
+        for i in range(200)
+    ]
+    write_queue.stop()
+
+    assert all(f.done() for f in futures)
+    assert [f.result() for f in futures] == list(range(200))
+    db = sqlite_file()
+    try:
+        assert db.query(Category).count() == 200
+    finally:
+        db.close()
+
+
+def test_writer_gives_each_grouped_write_its_own_result(sqlite_file, monkeypatch):
+    inventory_ledger.flush()
+    monkeypatch.setattr(inventory_ledger, "session_factory", sqlite_file)
+    db = sqlite_file()
+    try:
+        sweet_id = crud_sweet.sweet.create(
+            db, obj_in=SweetCreate(name="Aniseed Ball", category="Candy", price=1.0, quantity=10)
+        ).id
+    finally:
+        db.close()
+
+    write_queue = write_queue_for(sqlite_file.kw["bind"])
+    first = write_queue.enqueue(lambda session: crud_sweet.sweet.purchase(session, sweet_id=sweet_id, quantity=1))
+    second = write_queue.enqueue(lambda session: crud_sweet.sweet.purchase(session, sweet_id=sweet_id, quantity=2))
+    write_queue.stop()
+
+    assert first.result() is not second.result()
+    assert first.result().quantity == 9
+    assert second.result().quantity == 7
+
+
+def test_writer_runs_side_effects_only_after_group_commit(sqlite_file, monkeypatch):
+    inventory_ledger.flush()
+    monkeypatch.setattr(inventory_ledger, "session_factory", sqlite_file)
+    db = sqlite_file()
+    try:
+        sweet_id = crud_sweet.sweet.create(
+            db, obj_in=SweetCreate(name="Sherbet Lemon", category="Candy", price=1.0, quantity=10)
+        ).id
+    finally:
+        db.close()
+    inventory_ledger.flush()
+
+    write_queue = write_queue_for(sqlite_file.kw["bind"])
+    pending_during_group = []
+    write_queue.enqueue(lambda session: crud_sweet.sweet.purchase(session, sweet_id=sweet_id, quantity=1))
+    write_queue.enqueue(lambda session: pending_during_group.append(inventory_ledger.pending))
+    write_queue.stop()
+    assert pending_during_group == [0]
+    assert inventory_ledger.pending == 1
+
+    # A group whose COMMIT fails leaves no ledger entries behind
+    make_session = write_queue.session_factory
+
+    def failing_session():
+        session = make_session()
+
+        def commit():
+            raise RuntimeError("disk full")
+
+        session.commit = commit
+        return session
+
+    monkeypatch.setattr(write_queue, "session_factory", failing_session)
+    future = write_queue.enqueue(lambda session: crud_sweet.sweet.purchase(session, sweet_id=sweet_id, quantity=1))
+    write_queue.stop()
+    with pytest.raises(RuntimeError):
+        future.result()
+    assert inventory_ledger.pending == 1
+    inventory_ledger.flush()
+